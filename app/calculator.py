@@ -1,12 +1,14 @@
 """Main Calculator CLI with REPL, integrates operations, history, observers, and config."""
-from typing import List
+from typing import Iterable, List
 import os
 import shlex
 from colorama import Fore, Style, init as colorama_init
-from .calculator_config import Config
+from .calculator_config import Config, ConfigWatcher, HOT_RELOAD_FIELDS
 from .operations import get_operation, OP_REGISTRY
+from .plugins import load_plugins
 from .calculation import Calculation
 from .history import History
+from .session import SessionSnapshot, restore_history
 from .observers import LoggingObserver, AutoSaveObserver
 from .logger import setup_app_logger
 from .input_validators import to_number, check_limits
@@ -14,21 +16,56 @@ from .exceptions import OperationError, ValidationError
 
 colorama_init(autoreset=True)
 
+# Config fields captured in session snapshots and re-applied on restore.
+SESSION_CONFIG_FIELDS = ("precision", "max_input_value", "max_history_size")
+
 
 class Calculator:
     """Calculator ties together operations, history, observers, and provides a REPL."""
 
     def __init__(self, cfg: Config = None):
         self.cfg = cfg or Config()
+        # registers plugin metadata only; plugin modules are imported on first use
+        load_plugins(self.cfg.plugin_dir)
         self.history = History(max_size=self.cfg.max_history_size)
         log_path = setup_app_logger(self.cfg)
         self.log_observer = LoggingObserver(log_path)
         self.history.attach(self.log_observer)
+        self.autosave_observer: AutoSaveObserver | None = None
+        self._configure_autosave()
+        self._snapshot: SessionSnapshot | None = None
+        self.config_watcher: ConfigWatcher | None = None
+
+    def _configure_autosave(self):
+        if self.autosave_observer is not None:
+            self.history.detach(self.autosave_observer)
+            self.autosave_observer = None
         if self.cfg.auto_save:
             autosave_path = os.path.join(self.cfg.history_dir, self.cfg.history_file)
             self.autosave_observer = AutoSaveObserver(self.history, autosave_path, encoding=self.cfg.default_encoding)
             self.history.attach(self.autosave_observer)
 
+    def apply_config(self, cfg: Config, fields: Iterable[str] = HOT_RELOAD_FIELDS):
+        """Hot-apply reloadable settings from ``cfg`` without touching history or undo state.
+
+        Only ``fields`` are considered; a ConfigWatcher passes just the ones that
+        changed in its source. Log locations and the plugin directory only take
+        effect on a new Calculator.
+        """
+        changed = [name for name in fields if getattr(cfg, name) != getattr(self.cfg, name)]
+        for name in changed:
+            setattr(self.cfg, name, getattr(cfg, name))
+        if "max_history_size" in changed:
+            self.history.resize(self.cfg.max_history_size)
+        if {"auto_save", "history_dir", "history_file", "default_encoding"} & set(changed):
+            self._configure_autosave()
+        return changed
+
+    def watch_config(self, watcher: ConfigWatcher):
+        """Register with a watcher; the REPL polls it before running each command."""
+        watcher.register(self)
+        self.config_watcher = watcher
+
     def apply_operation(self, name: str, a: float, b: float):
         check_limits(a, self.cfg.max_input_value)
         check_limits(b, self.cfg.max_input_value)
@@ -43,6 +80,33 @@ class Calculator:
         except Exception as e:
             raise OperationError(str(e))
 
+    def _session_path(self, path: str | None) -> str:
+        return path or os.path.join(self.cfg.history_dir, self.cfg.session_file)
+
+    def save_session(self, path: str | None = None) -> str:
+        """Write history, undo/redo stacks, and config overrides to a snapshot.
+
+        Repeated saves to the same path append only new calculations.
+        """
+        path = self._session_path(path)
+        if self._snapshot is None or self._snapshot.path != path:
+            self._snapshot = SessionSnapshot(path)
+        overrides = {name: getattr(self.cfg, name) for name in SESSION_CONFIG_FIELDS}
+        self._snapshot.write(self.history, overrides)
+        return path
+
+    def restore_session(self, path: str | None = None) -> str:
+        """Replace the current session with the one stored in a snapshot."""
+        path = self._session_path(path)
+        state = SessionSnapshot.read(path)
+        for name, value in state.overrides.items():
+            if name in SESSION_CONFIG_FIELDS:
+                setattr(self.cfg, name, value)
+        restore_history(self.history, state)
+        # the next save rewrites the file instead of appending to it
+        self._snapshot = None
+        return path
+
     def list_operations(self) -> List[str]:
         return sorted(OP_REGISTRY.keys())
 
@@ -62,6 +126,13 @@ class Calculator:
             except (KeyboardInterrupt, EOFError):
                 print()
                 break
+            # after input, so edits made while the prompt was waiting apply to this command
+            if self.config_watcher is not None:
+                try:
+                    if self.config_watcher.check() is not None:
+                        print(Fore.YELLOW + "Configuration reloaded")
+                except Exception as e:
+                    print(Fore.RED + f"Config reload failed: {e}")
             parts = shlex.split(raw)
             if not parts:
                 continue
@@ -96,9 +167,15 @@ class Calculator:
                     path = args[0] if args else os.path.join(self.cfg.history_dir, self.cfg.history_file)
                     self.history.load_csv(path, encoding=self.cfg.default_encoding)
                     print(Fore.GREEN + f"Loaded from {path}")
+                elif cmd == "snapshot":
+                    path = self.save_session(args[0] if args else None)
+                    print(Fore.GREEN + f"Session saved to {path}")
+                elif cmd == "restore":
+                    path = self.restore_session(args[0] if args else None)
+                    print(Fore.GREEN + f"Session restored from {path}")
                 elif cmd == "help":
                     print(Fore.CYAN + self.help_text())
-                    print(Fore.CYAN + "Additional commands: history, clear, undo, redo, save [path], load [path], help, exit")
+                    print(Fore.CYAN + "Additional commands: history, clear, undo, redo, save [path], load [path], snapshot [path], restore [path], help, exit")
                 elif cmd == "exit":
                     break
                 else:
@@ -1,22 +1,164 @@
-"""Configuration loader for the calculator using python-dotenv."""
-from dataclasses import dataclass
+"""Configuration loader for the calculator using python-dotenv.
+
+Settings are read when a Config is constructed, not at import time, so
+separate instances can carry different settings. Each field comes from the
+process environment, then the ``.env`` file (found the same way
+``load_dotenv()`` finds it), then the built-in default. ConfigWatcher polls
+the file's mtime to hot-apply changes to live calculators.
+"""
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, List, Mapping, Optional
 import os
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv
+
+
+def _to_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
 
-load_dotenv()
+# field name -> (environment variable, default, parser)
+ENV_VARS: Dict[str, tuple] = {
+    "log_dir": ("CALCULATOR_LOG_DIR", "./logs", str),
+    "log_file": ("CALCULATOR_LOG_FILE", "calculator.log", str),
+    "history_dir": ("CALCULATOR_HISTORY_DIR", "./data", str),
+    "history_file": ("CALCULATOR_HISTORY_FILE", "history.csv", str),
+    "session_file": ("CALCULATOR_SESSION_FILE", "session.snap", str),
+    "max_history_size": ("CALCULATOR_MAX_HISTORY_SIZE", "100", int),
+    "auto_save": ("CALCULATOR_AUTO_SAVE", "True", _to_bool),
+    "precision": ("CALCULATOR_PRECISION", "6", int),
+    "max_input_value": ("CALCULATOR_MAX_INPUT_VALUE", str(1e12), float),
+    "plugin_dir": ("CALCULATOR_PLUGIN_DIR", "./plugins", str),
+    "default_encoding": ("CALCULATOR_DEFAULT_ENCODING", "utf-8", str),
+}
+
+# Settings that Calculator.apply_config can change on a running calculator.
+HOT_RELOAD_FIELDS = ("precision", "max_history_size", "max_input_value", "auto_save", "history_dir", "history_file", "default_encoding")
+
+
+def _env(name: str) -> Callable[[], Any]:
+    var, default, parse = ENV_VARS[name]
+    # DEFAULT_SOURCE is looked up per call so it can be swapped (e.g. in tests)
+    return lambda: parse(DEFAULT_SOURCE.get(var, default))
 
 
 @dataclass
 class Config:
-    log_dir: str = os.getenv("CALCULATOR_LOG_DIR", "./logs")
-    log_file: str = os.getenv("CALCULATOR_LOG_FILE", "calculator.log")
-    history_dir: str = os.getenv("CALCULATOR_HISTORY_DIR", "./data")
-    history_file: str = os.getenv("CALCULATOR_HISTORY_FILE", "history.csv")
-    max_history_size: int = int(os.getenv("CALCULATOR_MAX_HISTORY_SIZE", "100"))
-    auto_save: bool = os.getenv("CALCULATOR_AUTO_SAVE", "True").lower() in ("1", "true", "yes")
-    precision: int = int(os.getenv("CALCULATOR_PRECISION", "6"))
-    max_input_value: float = float(os.getenv("CALCULATOR_MAX_INPUT_VALUE", str(1e12)))
-    default_encoding: str = os.getenv("CALCULATOR_DEFAULT_ENCODING", "utf-8")
-
-
-__all__ = ["Config"]
+    log_dir: str = field(default_factory=_env("log_dir"))
+    log_file: str = field(default_factory=_env("log_file"))
+    history_dir: str = field(default_factory=_env("history_dir"))
+    history_file: str = field(default_factory=_env("history_file"))
+    session_file: str = field(default_factory=_env("session_file"))
+    max_history_size: int = field(default_factory=_env("max_history_size"))
+    auto_save: bool = field(default_factory=_env("auto_save"))
+    precision: int = field(default_factory=_env("precision"))
+    max_input_value: float = field(default_factory=_env("max_input_value"))
+    plugin_dir: str = field(default_factory=_env("plugin_dir"))
+    default_encoding: str = field(default_factory=_env("default_encoding"))
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str], **overrides) -> "Config":
+        """Build a Config from an explicit mapping instead of os.environ."""
+        values = {}
+        for f in fields(cls):
+            var, default, parse = ENV_VARS[f.name]
+            values[f.name] = parse(environ.get(var, default))
+        values.update(overrides)
+        return cls(**values)
+
+
+class ConfigSource:
+    """Reads configuration from a ``.env`` file layered under the process environment.
+
+    Process environment variables take precedence over the file, matching
+    ``load_dotenv``'s default of not overriding existing variables. With no
+    ``dotenv_path`` the file is located like ``load_dotenv()`` does, searching
+    upwards from this package. Parsed contents are cached until the mtime changes.
+    """
+
+    def __init__(self, dotenv_path: Optional[str] = None):
+        self.dotenv_path = dotenv_path
+        self._cached_mtime: Optional[int] = None
+        self._cached_values: Dict[str, str] = {}
+
+    @property
+    def path(self) -> str:
+        if self.dotenv_path is None:
+            # keep searching until a file turns up, so one created later is still found
+            found = find_dotenv()
+            if not found:
+                return ""
+            self.dotenv_path = found
+        return self.dotenv_path
+
+    def mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def dotenv(self) -> Dict[str, str]:
+        mtime = self.mtime()
+        if mtime is None:
+            return {}
+        if mtime != self._cached_mtime:
+            self._cached_values = {k: v for k, v in dotenv_values(self.path).items() if v is not None}
+            self._cached_mtime = mtime
+        return self._cached_values
+
+    def get(self, var: str, default: str) -> str:
+        value = os.environ.get(var)
+        if value is None:
+            value = self.dotenv().get(var, default)
+        return value
+
+    def environ(self) -> Dict[str, str]:
+        env = dict(self.dotenv())
+        env.update(os.environ)
+        return env
+
+    def load(self, **overrides) -> Config:
+        return Config.from_env(self.environ(), **overrides)
+
+
+DEFAULT_SOURCE = ConfigSource()
+
+
+class ConfigWatcher:
+    """Polls a ConfigSource and hot-applies changes to registered calculators.
+
+    Only fields whose source value changed since the previous load are applied,
+    so settings a calculator was given programmatically survive unrelated edits.
+    Call ``check()`` from the thread that drives the calculators; the REPL does
+    this after reading each command and before running it.
+    """
+
+    def __init__(self, source: ConfigSource):
+        self.source = source
+        self.targets: List[Any] = []
+        self._mtime = source.mtime()
+        self._cfg = source.load()
+
+    def register(self, calculator):
+        if calculator not in self.targets:
+            self.targets.append(calculator)
+
+    def unregister(self, calculator):
+        if calculator in self.targets:
+            self.targets.remove(calculator)
+
+    def check(self) -> Optional[Config]:
+        """Reload and apply if the file changed; returns the new Config or None."""
+        mtime = self.source.mtime()
+        if mtime == self._mtime:
+            return None
+        self._mtime = mtime
+        cfg = self.source.load()
+        changed = [name for name in HOT_RELOAD_FIELDS if getattr(cfg, name) != getattr(self._cfg, name)]
+        self._cfg = cfg
+        if changed:
+            for calc in list(self.targets):
+                calc.apply_config(cfg, changed)
+        return cfg
+
+
+__all__ = ["Config", "ConfigSource", "ConfigWatcher", "DEFAULT_SOURCE", "HOT_RELOAD_FIELDS"]
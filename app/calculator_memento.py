@@ -13,6 +13,9 @@ class CalculatorMemento:
     def get_state(self) -> List[Calculation]:
         return list(self._state)
 
+    def __len__(self) -> int:
+        return len(self._state)
+
 
 class Caretaker:
     """Stores mementos for undo/redo.
@@ -28,6 +31,12 @@ class Caretaker:
         self.undo_stack.append(CalculatorMemento(state))
         self.redo_stack.clear()
 
+    def discard_oldest(self, count: int = 1) -> int:
+        """Drop the oldest undo snapshots; returns how many were removed."""
+        count = min(count, len(self.undo_stack))
+        del self.undo_stack[:count]
+        return count
+
     def can_undo(self) -> bool:
         return len(self.undo_stack) > 0
 
@@ -1,11 +1,15 @@
 """History manager that stores calculations and notifies observers."""
-from typing import List, Callable, Any
+from typing import List, Callable, Any, Tuple
 import os
 import pandas as pd
 from .calculation import Calculation
-from .calculator_memento import Caretaker
+from .calculator_memento import Caretaker, CalculatorMemento
 from .exceptions import PersistenceError
 
+# Approximate per-object sizes (CPython, 64-bit) used by History.estimate_bytes.
+CALCULATION_BYTES = 570
+MEMENTO_BYTES = 400
+
 
 class History:
     """Keeps an ordered list of Calculation objects, supports undo/redo and persistence."""
@@ -36,10 +40,20 @@ class History:
         # Save snapshot before change
         self._caretaker.save(self._items)
         self._items.append(calculation)
-        if len(self._items) > self.max_size:
-            self._items = self._items[-self.max_size :]
+        self._trim()
         self._notify("calculation_added", calculation)
 
+    def _trim(self):
+        # in place: the caretaker already holds its own copy of the previous list
+        excess = len(self._items) - self.max_size
+        if excess > 0:
+            del self._items[:excess]
+
+    def resize(self, max_size: int):
+        """Change the retention limit, dropping the oldest items if it shrinks."""
+        self.max_size = max_size
+        self._trim()
+
     def list(self) -> List[Calculation]:
         return list(self._items)
 
@@ -58,6 +72,40 @@ class History:
         self._items = new_state
         self._notify("redo", None)
 
+    def estimate_bytes(self) -> int:
+        """Rough resident size of items plus undo/redo snapshots.
+
+        Items and snapshots share their Calculations, and each add() creates one
+        Calculation and one snapshot, so there are about one more distinct
+        Calculations than snapshots (or one per item, after a load). Every list
+        entry counts as a pointer.
+        """
+        stacks = self._caretaker.undo_stack + self._caretaker.redo_stack
+        distinct = max(len(self._items), len(stacks) + 1)
+        pointers = len(self._items) + sum(len(m) for m in stacks)
+        return distinct * CALCULATION_BYTES + len(stacks) * MEMENTO_BYTES + pointers * 8
+
+    def discard_undo(self, count: int = 1) -> int:
+        """Forget the oldest undo snapshots to free memory."""
+        return self._caretaker.discard_oldest(count)
+
+    def memento_stacks(self) -> Tuple[List[CalculatorMemento], List[CalculatorMemento]]:
+        """Return the undo and redo mementos themselves (no copies of their contents)."""
+        return list(self._caretaker.undo_stack), list(self._caretaker.redo_stack)
+
+    def export_state(self) -> Tuple[List[Calculation], List[List[Calculation]], List[List[Calculation]]]:
+        """Return (items, undo states, redo states) for session snapshots."""
+        undo = [m.get_state() for m in self._caretaker.undo_stack]
+        redo = [m.get_state() for m in self._caretaker.redo_stack]
+        return list(self._items), undo, redo
+
+    def import_state(self, items: List[Calculation], undo: List[List[Calculation]], redo: List[List[Calculation]]):
+        """Replace items and undo/redo stacks wholesale (no undo entry is recorded)."""
+        self._items = list(items)
+        self._caretaker.undo_stack = [CalculatorMemento(s) for s in undo]
+        self._caretaker.redo_stack = [CalculatorMemento(s) for s in redo]
+        self._notify("restored", None)
+
     def save_csv(self, path: str, encoding: str = "utf-8"):
         try:
             os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
@@ -1,4 +1,10 @@
 """Input validation helpers."""
+from dataclasses import dataclass
+from typing import Tuple
+import re
+import sys
+import numpy as np
+from pandas.api.types import infer_dtype
 from .exceptions import ValidationError
 
 
@@ -12,3 +18,215 @@ def to_number(value):
 def check_limits(value: float, max_value: float):
     if abs(value) > max_value:
         raise ValidationError(f"Value {value} exceeds allowed maximum of {max_value}")
+
+
+NAN_POLICIES = ("reject", "allow")
+INF_POLICIES = ("reject", "allow", "clip")
+# infer_dtype results meaning every entry is a str, or every entry a real number
+_STRING_KINDS = ("empty", "string")
+_NUMBER_KINDS = ("integer", "integer-na", "floating", "mixed-integer-float")
+_FLOAT_MAX = sys.float_info.max
+# plain numerals are converted this many at a time; a block that fails is checked entry by entry
+_BLOCK = 4096
+# byte -> kind for screening string tokens; kinds 1-4 appear in plain numerals,
+# 5 only in inf/infinity/nan or digit separators, 6 never in a number.
+# Non-ASCII characters are screened as "?" and are kind 6.
+_DIGIT, _DOT, _SIGN, _EXP, _SPACE, _WORD, _OTHER = range(7)
+
+
+def _kind_table() -> bytes:
+    table = bytearray([_OTHER]) * 256
+    for chars, kind in ((b"0123456789", _DIGIT), (b".", _DOT), (b"+-", _SIGN), (b"eE", _EXP), (b" \t\n\r\f\v", _SPACE), (b"infatyINFATY_", _WORD)):
+        for c in chars:
+            table[c] = kind
+    return bytes(table)
+
+
+_CHAR_KIND = _kind_table()
+_WS = r"[ \t\n\r\f\v]*"
+_DIGITS = r"[0-9](?:_?[0-9])*"
+# what float() accepts from an ASCII string
+_FLOAT_RE = re.compile(
+    rf"{_WS}[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?|inf(?:inity)?|nan){_WS}",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class BulkValidation:
+    """Outcome of validating many operands at once.
+
+    ``values`` holds the parsed floats (NaN where parsing failed), ``valid`` is a
+    boolean mask, and ``errors`` the positions of invalid entries.
+    """
+
+    values: np.ndarray
+    valid: np.ndarray
+    errors: np.ndarray
+
+    @property
+    def ok(self) -> bool:
+        return self.errors.size == 0
+
+    def raise_if_invalid(self, limit: int = 5):
+        if self.ok:
+            return
+        shown = ", ".join(str(i) for i in self.errors[:limit])
+        more = f" (+{self.errors.size - limit} more)" if self.errors.size > limit else ""
+        raise ValidationError(f"{self.errors.size} invalid value(s) at positions {shown}{more}")
+
+
+def _tokens(values) -> np.ndarray:
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        values = bytes(values).decode("ascii", errors="replace")
+    if isinstance(values, str):
+        values = values.replace(",", " ").split()
+    return np.asarray(values, dtype=object)
+
+
+def _classify(tokens: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Masks of str entries and of real-number entries; bool, None, bytes are neither."""
+    kind = infer_dtype(tokens, skipna=False)
+    if kind in _STRING_KINDS:
+        return np.ones(tokens.shape, dtype=bool), np.zeros(tokens.shape, dtype=bool)
+    if kind in _NUMBER_KINDS:
+        return np.zeros(tokens.shape, dtype=bool), np.ones(tokens.shape, dtype=bool)
+    is_str = np.fromiter((isinstance(v, str) for v in tokens), dtype=bool, count=tokens.size)
+    is_num = np.fromiter(
+        (isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_)) for v in tokens),
+        dtype=bool,
+        count=tokens.size,
+    )
+    return is_str, is_num
+
+
+def _screen(strs: np.ndarray, text: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sort strings into simple numerals, other plain numerals, and candidates.
+
+    Simple numerals (``[+-]digits[.digits]``) always convert. Other plain
+    numerals (exponents, surrounding whitespace) usually do. Candidates
+    contain inf/nan letters or ``_``. Anything else (other letters, symbols,
+    non-ASCII, no digits) is in none of the three and is rejected without being
+    parsed. ``text`` is the strings joined together; it is screened as one byte
+    buffer and every non-digit byte is mapped back to its token.
+    """
+    lengths = np.fromiter(map(len, strs), dtype=np.int64, count=strs.size)
+    ends = np.cumsum(lengths)
+    kinds = np.frombuffer(text.encode("ascii", "replace").translate(_CHAR_KIND), dtype=np.uint8)
+    pos = np.flatnonzero(kinds)
+    kind = kinds[pos]
+    owner = np.searchsorted(ends, pos, side="right")
+
+    def count(mask: np.ndarray) -> np.ndarray:
+        return np.bincount(owner[mask], minlength=strs.size)
+
+    has_digit = lengths > count(np.ones(pos.shape, dtype=bool))
+    other = count(kind == _OTHER) > 0
+    words = (count(kind == _WORD) > 0) & ~other
+    leading_sign = (kind == _SIGN) & (pos == (ends - lengths)[owner])
+    simple = (count(kind >= _EXP) == 0) & (count(kind == _DOT) <= 1) & (count((kind == _SIGN) & ~leading_sign) == 0) & has_digit
+    plain = ~simple & ~words & ~other & has_digit
+    return simple, plain, words
+
+
+def _parse_checked(strs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Match strings against float()'s grammar, then convert only the matches."""
+    parsed = np.fromiter((m is not None for m in map(_FLOAT_RE.fullmatch, strs)), dtype=bool, count=strs.size)
+    out = np.full(strs.shape, np.nan)
+    out[parsed] = strs[parsed].astype(np.float64)
+    return out, parsed
+
+
+def _parse_strings(strs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    text = "".join(strs)
+    if text.isascii():
+        # ASCII already follows float() rules; stops at the first bad entry, never per item
+        try:
+            return strs.astype(np.float64), np.ones(strs.shape, dtype=bool)
+        except ValueError:
+            pass
+    out = np.full(strs.shape, np.nan)
+    parsed = np.zeros(strs.shape, dtype=bool)
+    simple, plain, words = _screen(strs, text)
+    idx = np.flatnonzero(simple)
+    out[idx] = strs[idx].astype(np.float64)
+    parsed[idx] = True
+    idx = np.flatnonzero(plain)
+    for lo in range(0, idx.size, _BLOCK):
+        block = idx[lo:lo + _BLOCK]
+        try:
+            out[block] = strs[block].astype(np.float64)
+            parsed[block] = True
+        except ValueError:
+            # a malformed numeral such as "1.2.3" or "-" passed the screen
+            words[block] = True
+    idx = np.flatnonzero(words)
+    if idx.size:
+        out[idx], parsed[idx] = _parse_checked(strs[idx])
+    return out, parsed
+
+
+def parse_numbers(values) -> Tuple[np.ndarray, np.ndarray]:
+    """Parse a sequence or whitespace/comma separated buffer of numbers.
+
+    Returns ``(floats, parsed)`` where ``parsed`` is False for entries that are
+    not numbers; those hold NaN. Strings follow ``float()`` rules for ASCII
+    input (so ``"nan"``, ``"inf"`` and ``"1_000"`` parse) regardless of the
+    other entries, real numbers pass through, and anything else (``None``,
+    ``bool``, bytes) is rejected. Strings are screened by character class in
+    one vectorized pass: plain numerals are converted in blocks by NumPy,
+    inf/nan/underscore candidates (and blocks holding a malformed numeral) are
+    matched against float()'s grammar before converting, and the rest are
+    rejected without being parsed, so nothing raises per item.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        out = values.astype(np.float64).ravel()
+        return out, np.ones(out.shape, dtype=bool)
+    tokens = _tokens(values)
+    is_str, is_num = _classify(tokens)
+    if is_str.all():
+        return _parse_strings(tokens)
+    out = np.full(tokens.shape, np.nan)
+    parsed = np.zeros(tokens.shape, dtype=bool)
+    idx = np.flatnonzero(is_num)
+    if idx.size:
+        nums = tokens[idx]
+        try:
+            out[idx] = nums.astype(np.float64)
+            parsed[idx] = True
+        except OverflowError:
+            # ints beyond the float range are rejected rather than turned into inf
+            fits = np.fromiter((not isinstance(v, int) or abs(v) <= _FLOAT_MAX for v in nums), dtype=bool, count=nums.size)
+            out[idx[fits]] = nums[fits].astype(np.float64)
+            parsed[idx] = fits
+    idx = np.flatnonzero(is_str)
+    if idx.size:
+        out[idx], parsed[idx] = _parse_strings(tokens[idx])
+    return out, parsed
+
+
+def validate_numbers(values, max_value: float, nan_policy: str = "reject", inf_policy: str = "reject") -> BulkValidation:
+    """Parse and range-check many operands without raising per item.
+
+    ``nan_policy``: ``reject`` marks NaN invalid, ``allow`` lets it through.
+    ``inf_policy``: ``reject`` marks +/-inf invalid, ``allow`` lets it through
+    (bypassing the range check), ``clip`` replaces it with +/-``max_value``.
+    """
+    if nan_policy not in NAN_POLICIES:
+        raise ValueError(f"nan_policy must be one of {NAN_POLICIES}")
+    if inf_policy not in INF_POLICIES:
+        raise ValueError(f"inf_policy must be one of {INF_POLICIES}")
+    out, valid = parse_numbers(values)
+    nan = np.isnan(out) & valid
+    inf = np.isinf(out)
+    if nan_policy == "reject":
+        valid &= ~nan
+    if inf_policy == "clip":
+        out = np.where(inf, np.copysign(max_value, out), out)
+        inf = np.zeros_like(inf)
+    elif inf_policy == "reject":
+        valid &= ~inf
+    with np.errstate(invalid="ignore"):
+        in_range = ~(np.abs(out) > max_value) | inf
+    valid &= in_range
+    return BulkValidation(values=out, valid=valid, errors=np.flatnonzero(~valid))
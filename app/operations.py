@@ -9,7 +9,7 @@ import math
 OP_REGISTRY: Dict[str, Callable[..., "Operation"]] = {}
 
 
-def operation(name: str, help_text: str = ""):
+def operation(name: str, help_text: str = "", arity: int = 2):
     """Decorator to register an operation class under a name.
 
     The decorated class must implement execute(a, b).
@@ -18,6 +18,7 @@ def operation(name: str, help_text: str = ""):
     def _decorator(cls):
         cls.name = name
         cls.help_text = help_text
+        cls.arity = arity
         OP_REGISTRY[name] = cls
         return cls
 
@@ -29,6 +30,7 @@ class Operation:
 
     name: str = "op"
     help_text: str = ""
+    arity: int = 2
 
     def __init__(self, precision: int = 6):
         self.precision = precision
@@ -0,0 +1,210 @@
+"""Plugin discovery for operations with lazy registration.
+
+Plugins come from two places:
+
+- ``importlib.metadata`` entry points in the ``advanced_calculator.operations``
+  group. The entry point name is the operation name and the value points at
+  the operation class, e.g. ``sqrt = my_pkg.ops:SquareRoot``.
+- ``.py`` files in a plugin directory (``Config.plugin_dir``).
+
+Discovery does not import plugin modules. Their source is parsed and the
+``@operation("name", "help", arity)`` decorators are read statically, so only
+the metadata is registered at startup. The module is imported the first time
+the operation is instantiated, at which point its real class replaces the
+placeholder in ``OP_REGISTRY``. Any other ``@operation`` registrations made by
+that import are rolled back, so a plugin can never replace a built-in.
+"""
+from typing import Dict, List, Optional, Set
+import ast
+import importlib
+import importlib.util
+import logging
+import os
+from importlib import metadata
+from .operations import OP_REGISTRY, Operation
+
+ENTRY_POINT_GROUP = "advanced_calculator.operations"
+
+logger = logging.getLogger("advanced_calculator")
+
+# sources already scanned, so constructing many calculators stays cheap
+_discovered: Set[str] = set()
+# entry points are read once per process; scanning installed distributions is slow
+_entry_points_scanned = False
+
+
+class LazyOperation:
+    """Registry placeholder that imports the real operation on first use.
+
+    Exposes the same ``name``/``help_text``/``arity`` attributes as an
+    operation class and is called like one.
+    """
+
+    def __init__(self, name: str, help_text: str, arity: int, module: str, attr: Optional[str] = None, path: Optional[str] = None):
+        self.name = name
+        self.help_text = help_text
+        self.arity = arity
+        self.module = module
+        self.attr = attr
+        self.path = path
+
+    def load(self):
+        """Import the plugin module and return the registered operation class."""
+        before = dict(OP_REGISTRY)
+        try:
+            if self.path:
+                spec = importlib.util.spec_from_file_location(self.module, self.path)
+                mod = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(mod)
+            else:
+                mod = importlib.import_module(self.module)
+        except Exception:
+            self._restore_registry(before, keep=None)
+            raise
+        cls = OP_REGISTRY.get(self.name)
+        self._restore_registry(before, keep=self.name)
+        if cls is self or cls is None:
+            # the module did not use @operation; fall back to the named attribute
+            cls = getattr(mod, self.attr) if self.attr else None
+            if not (isinstance(cls, type) and issubclass(cls, Operation)):
+                raise KeyError(f"Plugin '{self.module}' does not provide operation '{self.name}'")
+            cls.name = self.name
+            cls.help_text = getattr(cls, "help_text", "") or self.help_text
+            OP_REGISTRY[self.name] = cls
+        return cls
+
+    def _restore_registry(self, before: Dict[str, object], keep: Optional[str]):
+        # importing runs every @operation in the module; only this entry and
+        # placeholders pointing at the same module may take the real classes
+        for name in list(OP_REGISTRY):
+            if name == keep:
+                continue
+            old = before.get(name)
+            if old is None:
+                del OP_REGISTRY[name]
+            elif not self._same_source(old) or keep is None:
+                OP_REGISTRY[name] = old
+
+    def _same_source(self, other) -> bool:
+        return isinstance(other, LazyOperation) and (other.module, other.path) == (self.module, self.path)
+
+    def __call__(self, precision: int = 6) -> Operation:
+        return self.load()(precision=precision)
+
+    def __repr__(self):
+        return f"LazyOperation({self.name!r}, module={self.module!r})"
+
+
+def _literal(node, default):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        return default
+
+
+def scan_source(source: str) -> Dict[str, dict]:
+    """Return ``{class_name: {"name", "help_text", "arity"}}`` for @operation classes."""
+    found: Dict[str, dict] = {}
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        for dec in node.decorator_list:
+            if not isinstance(dec, ast.Call):
+                continue
+            func = dec.func
+            fname = func.id if isinstance(func, ast.Name) else getattr(func, "attr", None)
+            if fname != "operation" or not dec.args:
+                continue
+            values = [_literal(a, None) for a in dec.args]
+            kw = {k.arg: _literal(k.value, None) for k in dec.keywords}
+            name = values[0]
+            if not isinstance(name, str):
+                continue
+            found[node.name] = {
+                "name": name,
+                "help_text": kw.get("help_text", values[1] if len(values) > 1 else "") or "",
+                "arity": kw.get("arity", values[2] if len(values) > 2 else 2) or 2,
+            }
+    return found
+
+
+def _register(lazy: LazyOperation) -> bool:
+    # built-ins and earlier plugins win over later ones
+    if lazy.name in OP_REGISTRY:
+        return False
+    OP_REGISTRY[lazy.name] = lazy
+    return True
+
+
+def discover_directory(plugin_dir: str) -> List[str]:
+    """Register lazy operations for every ``.py`` file in ``plugin_dir``."""
+    registered: List[str] = []
+    if not plugin_dir or not os.path.isdir(plugin_dir):
+        return registered
+    for fname in sorted(os.listdir(plugin_dir)):
+        if not fname.endswith(".py") or fname.startswith("_"):
+            continue
+        path = os.path.abspath(os.path.join(plugin_dir, fname))
+        if path in _discovered:
+            continue
+        _discovered.add(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                found = scan_source(f.read())
+        except (OSError, SyntaxError, UnicodeDecodeError) as e:
+            logger.warning(f"Skipping plugin {path}: {e}")
+            continue
+        module = f"calculator_plugins.{fname[:-3]}"
+        for cls_name, meta in found.items():
+            lazy = LazyOperation(meta["name"], meta["help_text"], meta["arity"], module, cls_name, path=path)
+            if _register(lazy):
+                registered.append(lazy.name)
+    return registered
+
+
+def _entry_points():
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):
+        return list(eps.select(group=ENTRY_POINT_GROUP))
+    return list(eps.get(ENTRY_POINT_GROUP, []))  # pragma: no cover - Python < 3.10
+
+
+def _scan_module(module: str) -> Dict[str, dict]:
+    # find_spec imports parent packages only, never the plugin module itself
+    try:
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            return {}
+        with open(spec.origin, encoding="utf-8") as f:
+            return scan_source(f.read())
+    except (ImportError, OSError, SyntaxError, ValueError, UnicodeDecodeError):
+        return {}
+
+
+def discover_entry_points() -> List[str]:
+    """Register lazy operations for installed entry points (once per process)."""
+    global _entry_points_scanned
+    registered: List[str] = []
+    if _entry_points_scanned:
+        return registered
+    _entry_points_scanned = True
+    for ep in _entry_points():
+        key = f"ep:{ep.name}={ep.value}"
+        if key in _discovered:
+            continue
+        _discovered.add(key)
+        module, _, attr = ep.value.partition(":")
+        attr = attr.strip() or None
+        meta = _scan_module(module.strip()).get(attr or "", {})
+        lazy = LazyOperation(ep.name, meta.get("help_text", ""), meta.get("arity", 2), module.strip(), attr)
+        if _register(lazy):
+            registered.append(lazy.name)
+    return registered
+
+
+def load_plugins(plugin_dir: Optional[str] = None) -> List[str]:
+    """Discover entry point and directory plugins; returns newly registered names."""
+    return discover_entry_points() + discover_directory(plugin_dir or "")
+
+
+__all__ = ["ENTRY_POINT_GROUP", "LazyOperation", "load_plugins", "discover_directory", "discover_entry_points", "scan_source"]
@@ -0,0 +1,365 @@
+"""Binary session snapshots: history, undo/redo stacks, and config overrides.
+
+A snapshot file starts with a fixed header (magic + format version) followed by
+a sequence of frames. Each frame carries a type byte, payload length, and a
+CRC32 of the payload so corruption is detected on restore.
+
+Two frame types exist:
+
+- ``CALC`` frames hold one Calculation each. Calculations are numbered in the
+  order they appear in the file and are written only once, even though the
+  same object is usually shared by the history and many mementos.
+- ``STATE`` frames reference calculations by number and describe the current
+  items, the undo/redo stacks, ``max_size``, and config overrides. Each
+  memento is stored as a delta from the one below it on its stack ("drop k
+  from the front, keep m, append these"), so a stack of N snapshots costs
+  O(N) rather than O(N x history size).
+
+Writes are incremental: ``SessionSnapshot.write`` appends only calculations
+not yet in the file, plus a new STATE frame. Once the superseded STATE frames
+outweigh the live data the file is rewritten from scratch. On restore the last
+complete STATE frame wins; a truncated trailing frame (interrupted write) is
+ignored.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import struct
+import zlib
+from .calculation import Calculation
+from .exceptions import PersistenceError
+
+MAGIC = b"CALCSNAP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<8sH")
+_FRAME = struct.Struct("<BII")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_F64 = struct.Struct("<d")
+
+FRAME_CALC = 1
+FRAME_STATE = 2
+
+
+def _pack_str(s: str) -> bytes:
+    raw = s.encode("utf-8")
+    return _U16.pack(len(raw)) + raw
+
+
+def _unpack_str(buf: bytes, pos: int) -> Tuple[str, int]:
+    (n,) = _U16.unpack_from(buf, pos)
+    pos += _U16.size
+    return buf[pos : pos + n].decode("utf-8"), pos + n
+
+
+def _pack_indices(indices: List[int]) -> bytes:
+    return _U32.pack(len(indices)) + struct.pack(f"<{len(indices)}I", *indices)
+
+
+def _unpack_indices(buf: bytes, pos: int) -> Tuple[Tuple[int, ...], int]:
+    (n,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    return struct.unpack_from(f"<{n}I", buf, pos), pos + 4 * n
+
+
+def _delta(prev: List[int], cur: List[int]) -> Tuple[int, int]:
+    """Return (k, m) such that cur == prev[k : k + m] + cur[m:] with m as large as found."""
+    k = len(prev)
+    if cur and prev:
+        try:
+            k = prev.index(cur[0])
+        except ValueError:
+            pass
+    run = min(len(prev) - k, len(cur))
+    m = run
+    if prev[k : k + run] != cur[:run]:
+        m = 0
+        while m < run and prev[k + m] == cur[m]:
+            m += 1
+    return k, m
+
+
+def _pack_delta(k: int, m: int, appended: Tuple[int, ...]) -> bytes:
+    return struct.pack("<II", k, m) + _pack_indices(list(appended))
+
+
+def _decode_stack(buf: bytes, pos: int, calcs: List[Calculation]) -> Tuple[List[List[Calculation]], int]:
+    (count,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    stack: List[List[Calculation]] = []
+    prev: List[Calculation] = []
+    for _ in range(count):
+        k, m = struct.unpack_from("<II", buf, pos)
+        idx, pos = _unpack_indices(buf, pos + 8)
+        if k + m > len(prev):
+            raise ValueError("memento delta out of range")
+        cur = prev[k : k + m] + [calcs[i] for i in idx]
+        stack.append(cur)
+        prev = cur
+    return stack, pos
+
+
+def encode_calculation(calc: Calculation) -> bytes:
+    operands = [float(x) for x in calc.operands]
+    return b"".join(
+        [
+            _pack_str(calc.operation),
+            _U16.pack(len(operands)),
+            struct.pack(f"<{len(operands)}d", *operands),
+            _F64.pack(float(calc.result)),
+            _pack_str(calc.timestamp or ""),
+        ]
+    )
+
+
+def decode_calculation(buf: bytes) -> Calculation:
+    operation, pos = _unpack_str(buf, 0)
+    (n,) = _U16.unpack_from(buf, pos)
+    pos += _U16.size
+    operands = list(struct.unpack_from(f"<{n}d", buf, pos))
+    pos += 8 * n
+    (result,) = _F64.unpack_from(buf, pos)
+    pos += _F64.size
+    timestamp, _ = _unpack_str(buf, pos)
+    return Calculation(operation=operation, operands=operands, result=result, timestamp=timestamp)
+
+
+class SessionState:
+    """Plain container for everything a snapshot restores."""
+
+    def __init__(
+        self,
+        items: List[Calculation],
+        undo_stack: List[List[Calculation]],
+        redo_stack: List[List[Calculation]],
+        max_size: int,
+        overrides: Optional[Dict[str, Any]] = None,
+    ):
+        self.items = items
+        self.undo_stack = undo_stack
+        self.redo_stack = redo_stack
+        self.max_size = max_size
+        self.overrides = overrides or {}
+
+
+class SessionSnapshot:
+    """Writes history state to a snapshot file incrementally and restores it.
+
+    Keep one instance per file for the lifetime of a session so repeated
+    ``write`` calls only append what changed since the last one. Mementos never
+    change once created, so each one's encoded delta is cached and only
+    mementos new since the previous write are encoded. Use ``compact`` to
+    rewrite the file with just the live calculations.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # id(calc) -> frame number; _written keeps the objects alive so ids stay unique
+        self._index: Dict[int, int] = {}
+        self._written: List[Calculation] = []
+        # id(memento) -> (memento, memento below it, k, m, appended indices, encoded delta);
+        # holding both mementos keeps their ids stable while cached
+        self._deltas: Dict[int, tuple] = {}
+        # bytes of CALC frames and of all STATE frames in the file, plus the latest STATE frame
+        self._calc_bytes = 0
+        self._state_bytes = 0
+        self._last_state_bytes = 0
+
+    def _reset(self):
+        self._index.clear()
+        self._written.clear()
+        self._deltas.clear()
+        self._calc_bytes = self._state_bytes = self._last_state_bytes = 0
+
+    def _needs_compaction(self) -> bool:
+        stale = self._state_bytes - self._last_state_bytes
+        return stale > self._calc_bytes + self._last_state_bytes
+
+    def _intern(self, calc: Calculation, out: List[bytes]) -> int:
+        idx = self._index.get(id(calc))
+        if idx is None:
+            idx = len(self._written)
+            self._index[id(calc)] = idx
+            self._written.append(calc)
+            frame = _frame(FRAME_CALC, encode_calculation(calc))
+            self._calc_bytes += len(frame)
+            out.append(frame)
+        return idx
+
+    def _delta_entry(self, memento, prev, out: List[bytes]) -> tuple:
+        cached = self._deltas.get(id(memento))
+        if cached is not None and cached[1] is prev:
+            return cached
+        cur = memento.get_state()
+        below = prev.get_state() if prev is not None else []
+        k, m = _delta([id(c) for c in below], [id(c) for c in cur])
+        appended = tuple(self._intern(c, out) for c in cur[m:])
+        return (memento, prev, k, m, appended, _pack_delta(k, m, appended))
+
+    def _encode_stacks(self, stacks, out: List[bytes]) -> bytes:
+        live: Dict[int, tuple] = {}
+        parts: List[bytes] = []
+        for stack in stacks:
+            parts.append(_U32.pack(len(stack)))
+            prev = None
+            for memento in stack:
+                entry = self._delta_entry(memento, prev, out)
+                live[id(memento)] = entry
+                parts.append(entry[5])
+                prev = memento
+        # mementos that left the stacks drop out of the cache
+        self._deltas = live
+        return b"".join(parts)
+
+    def _renumber(self, items: List[Calculation], stacks) -> List[bytes]:
+        """Drop unreferenced calculations and renumber the rest, keeping cached deltas.
+
+        Returns the CALC frames that start the rewritten file.
+        """
+        valid: Dict[int, tuple] = {}
+        for stack in stacks:
+            prev = None
+            for memento in stack:
+                entry = self._deltas.get(id(memento))
+                if entry is not None and entry[1] is prev:
+                    valid[id(memento)] = entry
+                prev = memento
+        live = set()
+        for entry in valid.values():
+            live.update(entry[4])
+        live.update(i for i in (self._index.get(id(c)) for c in items) if i is not None)
+        order = sorted(live)
+        remap = {old: new for new, old in enumerate(order)}
+        self._written = [self._written[i] for i in order]
+        self._index = {id(c): i for i, c in enumerate(self._written)}
+        self._deltas = {}
+        for key, (memento, prev, k, m, appended, _) in valid.items():
+            appended = tuple(remap[i] for i in appended)
+            self._deltas[key] = (memento, prev, k, m, appended, _pack_delta(k, m, appended))
+        frames = [_frame(FRAME_CALC, encode_calculation(c)) for c in self._written]
+        self._calc_bytes = sum(len(f) for f in frames)
+        self._state_bytes = self._last_state_bytes = 0
+        return frames
+
+    def write(self, history, overrides: Optional[Dict[str, Any]] = None):
+        """Append the current state of ``history`` to the snapshot file."""
+        try:
+            stacks = history.memento_stacks()
+            items = history.list()
+            frames: List[bytes] = []
+            fresh = True
+            if not self._written or not os.path.exists(self.path):
+                self._reset()
+            elif self._needs_compaction():
+                frames.extend(self._renumber(items, stacks))
+            else:
+                fresh = False
+            state = [
+                _U32.pack(history.max_size),
+                _pack_indices([self._intern(c, frames) for c in items]),
+                self._encode_stacks(stacks, frames),
+            ]
+            raw_overrides = json.dumps(overrides or {}, sort_keys=True).encode("utf-8")
+            state.append(_U32.pack(len(raw_overrides)) + raw_overrides)
+            state_frame = _frame(FRAME_STATE, b"".join(state))
+            frames.append(state_frame)
+            self._state_bytes += len(state_frame)
+            self._last_state_bytes = len(state_frame)
+
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "wb" if fresh else "ab") as f:
+                if fresh:
+                    f.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+                f.write(b"".join(frames))
+        except Exception as e:
+            # the file may now end in a partial frame; start over on the next write
+            self._reset()
+            raise PersistenceError(str(e))
+
+    def compact(self, history, overrides: Optional[Dict[str, Any]] = None):
+        """Rewrite the file from scratch, dropping calculations no longer referenced.
+
+        ``write`` already does this on its own once stale frames dominate the file.
+        """
+        self._reset()
+        self.write(history, overrides)
+
+    @staticmethod
+    def read(path: str) -> SessionState:
+        """Load the most recent complete state from a snapshot file."""
+        try:
+            with open(path, "rb") as f:
+                buf = f.read()
+        except FileNotFoundError:
+            raise PersistenceError(f"File not found: {path}")
+        except Exception as e:
+            raise PersistenceError(str(e))
+
+        if len(buf) < _HEADER.size:
+            raise PersistenceError(f"Not a session snapshot: {path}")
+        magic, version = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise PersistenceError(f"Not a session snapshot: {path}")
+        if version != FORMAT_VERSION:
+            raise PersistenceError(f"Unsupported snapshot version {version} (expected {FORMAT_VERSION})")
+
+        calcs: List[Calculation] = []
+        last_state: Optional[bytes] = None
+        pos = _HEADER.size
+        while pos + _FRAME.size <= len(buf):
+            kind, length, crc = _FRAME.unpack_from(buf, pos)
+            start = pos + _FRAME.size
+            if start + length > len(buf):
+                break  # truncated trailing frame from an interrupted write
+            payload = buf[start : start + length]
+            if zlib.crc32(payload) != crc:
+                raise PersistenceError(f"Snapshot checksum mismatch at offset {pos}")
+            if kind == FRAME_CALC:
+                try:
+                    calcs.append(decode_calculation(payload))
+                except (struct.error, ValueError) as e:
+                    raise PersistenceError(f"Corrupt calculation at offset {pos}: {e}")
+            elif kind == FRAME_STATE:
+                last_state = payload
+            else:
+                raise PersistenceError(f"Unknown snapshot frame type {kind} at offset {pos}")
+            pos = start + length
+
+        if last_state is None:
+            raise PersistenceError(f"Snapshot contains no session state: {path}")
+        try:
+            return _decode_state(last_state, calcs)
+        except (struct.error, IndexError, ValueError) as e:
+            raise PersistenceError(f"Corrupt session state: {e}")
+
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return _FRAME.pack(kind, len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_state(buf: bytes, calcs: List[Calculation]) -> SessionState:
+    (max_size,) = _U32.unpack_from(buf, 0)
+    idx, pos = _unpack_indices(buf, _U32.size)
+    items = [calcs[i] for i in idx]
+    stacks: List[List[List[Calculation]]] = []
+    for _ in range(2):
+        stack, pos = _decode_stack(buf, pos, calcs)
+        stacks.append(stack)
+    (n,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    overrides = json.loads(buf[pos : pos + n].decode("utf-8"))
+    return SessionState(items, stacks[0], stacks[1], max_size, overrides)
+
+
+def restore_history(history, state: SessionState):
+    """Replace history contents and undo/redo stacks with a restored state.
+
+    Unlike ``History.load_csv`` this does not push the previous list onto the
+    undo stack; the restored stacks replace the current ones.
+    """
+    history.import_state(state.items, state.undo_stack, state.redo_stack)
+    history.max_size = state.max_size
+
+
+__all__ = ["SessionSnapshot", "SessionState", "restore_history", "FORMAT_VERSION"]
@@ -0,0 +1,221 @@
+"""Host many calculator sessions in one process.
+
+Sessions share the module-level operation registry and the application
+loggers; each gets its own History. A per-session memory budget is enforced
+after every history change by discarding the oldest undo snapshots; if that
+is not enough the overrun is counted in ``metrics()``. When too many sessions
+(or too many bytes) are resident, the least recently used ones are spilled to
+disk as session snapshots and restored transparently on next access.
+"""
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import replace
+import logging
+import os
+import re
+import threading
+import time
+from .calculator import Calculator
+from .calculator_config import Config, HOT_RELOAD_FIELDS
+from .exceptions import PersistenceError, ValidationError
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+# History events after which the session's memory budget is re-checked
+_HISTORY_CHANGES = ("calculation_added", "loaded", "restored", "undo", "redo")
+
+logger = logging.getLogger("advanced_calculator")
+
+
+class SessionManager:
+    """LRU-managed pool of Calculator sessions with spill/restore to disk."""
+
+    def __init__(
+        self,
+        cfg: Config = None,
+        spill_dir: Optional[str] = None,
+        max_resident: int = 32,
+        session_budget_bytes: int = 1 << 20,
+        total_budget_bytes: Optional[int] = None,
+    ):
+        self.cfg = cfg or Config()
+        self.spill_dir = spill_dir or os.path.join(self.cfg.history_dir, "sessions")
+        self.max_resident = max_resident
+        self.session_budget_bytes = session_budget_bytes
+        self.total_budget_bytes = total_budget_bytes
+        self._resident: "OrderedDict[str, Calculator]" = OrderedDict()
+        # session id -> (snapshot path, config generation at spill time)
+        self._spilled: Dict[str, Tuple[str, int]] = {}
+        # bumped by apply_config so restores know which settings changed while spilled
+        self._config_generation = 0
+        # config generation -> fields that apply_config changed in it
+        self._generation_fields: Dict[int, frozenset] = {}
+        self._lock = threading.RLock()
+        self._stats = {
+            "spills": 0,
+            "restores": 0,
+            "spill_seconds": 0.0,
+            "restore_seconds": 0.0,
+            "last_spill_seconds": 0.0,
+            "last_restore_seconds": 0.0,
+            "spill_failures": 0,
+            "undo_snapshots_discarded": 0,
+            "budget_overruns": 0,
+        }
+
+    def _spill_path(self, session_id: str) -> str:
+        return os.path.join(self.spill_dir, f"{session_id}.snap")
+
+    def _session_cfg(self, session_id: str) -> Config:
+        return replace(self.cfg, history_file=f"{session_id}.csv")
+
+    def _new_calculator(self, session_id: str) -> Calculator:
+        calc = Calculator(self._session_cfg(session_id))
+        # enforce the budget on every history change, not only via apply()
+        calc.history.attach(self._budget_observer(calc))
+        return calc
+
+    def apply_config(self, cfg: Config, fields: Iterable[str] = HOT_RELOAD_FIELDS):
+        """Hot-apply reloadable settings to the manager and every resident session.
+
+        Only ``fields`` that differ from the manager's settings are forwarded,
+        so per-session values of the others are kept. Lets a ConfigWatcher
+        target the manager directly; spilled sessions pick the changed settings
+        up when restored. Returns the changed field names.
+        """
+        with self._lock:
+            changed = [name for name in fields if getattr(cfg, name) != getattr(self.cfg, name)]
+            if not changed:
+                return changed
+            self._config_generation += 1
+            self._generation_fields[self._config_generation] = frozenset(changed)
+            for name in changed:
+                setattr(self.cfg, name, getattr(cfg, name))
+            for session_id, calc in self._resident.items():
+                calc.apply_config(self._session_cfg(session_id), changed)
+            self._prune_generations()
+            return changed
+
+    def _fields_changed_since(self, generation: int) -> set:
+        changed = set()
+        for g in range(generation + 1, self._config_generation + 1):
+            changed |= self._generation_fields.get(g, frozenset())
+        return changed
+
+    def _prune_generations(self):
+        # only generations newer than the oldest spilled session are still needed
+        oldest = min((g for _, g in self._spilled.values()), default=self._config_generation)
+        for g in [g for g in self._generation_fields if g <= oldest]:
+            del self._generation_fields[g]
+
+    def get(self, session_id: str) -> Calculator:
+        """Return the session's calculator, creating or restoring it as needed."""
+        if not _SESSION_ID.match(session_id or ""):
+            raise ValidationError(f"Invalid session id: {session_id!r}")
+        with self._lock:
+            calc = self._resident.get(session_id)
+            if calc is not None:
+                self._resident.move_to_end(session_id)
+                return calc
+            calc = self._new_calculator(session_id)
+            spilled = self._spilled.get(session_id)
+            if spilled is not None:
+                path, generation = spilled
+                start = time.perf_counter()
+                calc.restore_session(path)
+                changed = self._fields_changed_since(generation)
+                if changed:
+                    # settings reloaded while the session was on disk win over the snapshot's
+                    calc.apply_config(self._session_cfg(session_id), changed)
+                del self._spilled[session_id]
+                self._prune_generations()
+                os.remove(path)
+                self._record("restore", time.perf_counter() - start)
+            self._resident[session_id] = calc
+            self._evict(keep=session_id)
+            return calc
+
+    def apply(self, session_id: str, name: str, a: float, b: float):
+        """Run an operation in a session, then enforce memory budgets."""
+        with self._lock:
+            calc = self.get(session_id)
+            result = calc.apply_operation(name, a, b)
+            self._evict(keep=session_id)
+            return result
+
+    def close(self, session_id: str):
+        """Drop a session entirely, including any spilled state."""
+        with self._lock:
+            self._resident.pop(session_id, None)
+            spilled = self._spilled.pop(session_id, None)
+            if spilled is not None:
+                self._prune_generations()
+                if os.path.exists(spilled[0]):
+                    os.remove(spilled[0])
+
+    def spill(self, session_id: str):
+        """Write a resident session to disk and release it from memory.
+
+        The session stays resident if the write fails.
+        """
+        with self._lock:
+            calc = self._resident[session_id]
+            path = self._spill_path(session_id)
+            start = time.perf_counter()
+            calc.save_session(path)
+            self._record("spill", time.perf_counter() - start)
+            del self._resident[session_id]
+            self._spilled[session_id] = (path, self._config_generation)
+
+    def _budget_observer(self, calc: Calculator) -> Callable[[str, Any], None]:
+        def observer(event_type: str, data: Any):
+            if event_type in _HISTORY_CHANGES:
+                self._enforce_session_budget(calc)
+
+        return observer
+
+    def _enforce_session_budget(self, calc: Calculator):
+        history = calc.history
+        while history.estimate_bytes() > self.session_budget_bytes and history.discard_undo(1):
+            self._stats["undo_snapshots_discarded"] += 1
+        if history.estimate_bytes() > self.session_budget_bytes:
+            # nothing left to discard without dropping live history; report it instead
+            self._stats["budget_overruns"] += 1
+
+    def _evict(self, keep: str):
+        def over_budget() -> bool:
+            if len(self._resident) > self.max_resident:
+                return True
+            return self.total_budget_bytes is not None and self.resident_bytes() > self.total_budget_bytes
+
+        while over_budget():
+            victim = next((sid for sid in self._resident if sid != keep), None)
+            if victim is None:
+                break
+            try:
+                self.spill(victim)
+            except PersistenceError as e:
+                # keep the victim in memory rather than lose it; try again on the next access
+                self._stats["spill_failures"] += 1
+                logger.warning(f"Could not spill session {victim}: {e}")
+                break
+
+    def _record(self, kind: str, seconds: float):
+        self._stats[f"{kind}s"] += 1
+        self._stats[f"{kind}_seconds"] += seconds
+        self._stats[f"last_{kind}_seconds"] = seconds
+
+    def resident_bytes(self) -> int:
+        return sum(c.history.estimate_bytes() for c in self._resident.values())
+
+    def metrics(self) -> dict:
+        """Session counts, estimated resident bytes, and spill/restore latency."""
+        with self._lock:
+            m = dict(self._stats)
+            m["resident_sessions"] = len(self._resident)
+            m["spilled_sessions"] = len(self._spilled)
+            m["active_sessions"] = len(self._resident) + len(self._spilled)
+            m["resident_bytes"] = self.resident_bytes()
+            return m
+
+
+__all__ = ["SessionManager"]
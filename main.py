@@ -3,12 +3,14 @@
 Run this file after creating and activating a virtual environment.
 """
 from app.calculator import Calculator
-from app.calculator_config import Config
+from app.calculator_config import ConfigSource, ConfigWatcher
 
 
 def main():
-    cfg = Config()
-    calc = Calculator(cfg)
+    source = ConfigSource()
+    calc = Calculator(source.load())
+    # picks up .env edits between commands without restarting
+    calc.watch_config(ConfigWatcher(source))
     try:
         calc.repl()
     except KeyboardInterrupt:
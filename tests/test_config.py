@@ -1,5 +1,6 @@
 import os
-from app.calculator_config import Config
+from app.calculator import Calculator
+from app.calculator_config import Config, ConfigSource, ConfigWatcher
 
 
 def test_config_defaults(monkeypatch):
@@ -10,3 +11,112 @@ def test_config_defaults(monkeypatch):
     assert isinstance(cfg.log_dir, str)
     assert isinstance(cfg.history_dir, str)
     assert cfg.max_history_size >= 1
+
+
+def test_config_reads_env_at_construction(monkeypatch):
+    monkeypatch.setenv("CALCULATOR_PRECISION", "3")
+    assert Config().precision == 3
+    monkeypatch.setenv("CALCULATOR_PRECISION", "4")
+    assert Config().precision == 4
+    cfg = Config.from_env({"CALCULATOR_AUTO_SAVE": "no"}, precision=2)
+    assert cfg.auto_save is False and cfg.precision == 2
+
+
+def test_config_source_layers_env_over_dotenv(tmp_path, monkeypatch):
+    env_file = tmp_path / ".env"
+    env_file.write_text("CALCULATOR_PRECISION=2\nCALCULATOR_MAX_HISTORY_SIZE=7\n")
+    monkeypatch.setenv("CALCULATOR_MAX_HISTORY_SIZE", "9")
+    cfg = ConfigSource(str(env_file)).load()
+    assert cfg.precision == 2
+    assert cfg.max_history_size == 9
+    assert ConfigSource(str(tmp_path / "missing.env")).mtime() is None
+
+
+def test_watcher_hot_applies_to_calculator(tmp_path, monkeypatch):
+    monkeypatch.delenv("CALCULATOR_PRECISION", raising=False)
+    monkeypatch.delenv("CALCULATOR_MAX_HISTORY_SIZE", raising=False)
+    env_file = tmp_path / ".env"
+    env_file.write_text(f"CALCULATOR_AUTO_SAVE=false\nCALCULATOR_HISTORY_DIR={tmp_path}\n")
+    source = ConfigSource(str(env_file))
+    calc = Calculator(source.load())
+    watcher = ConfigWatcher(source)
+    calc.watch_config(watcher)
+    for i in range(5):
+        calc.apply_operation("divide", 1, 3)
+    assert watcher.check() is None
+
+    env_file.write_text(
+        f"CALCULATOR_AUTO_SAVE=true\nCALCULATOR_HISTORY_DIR={tmp_path}\n"
+        "CALCULATOR_PRECISION=2\nCALCULATOR_MAX_HISTORY_SIZE=3\n"
+    )
+    os.utime(env_file, ns=(0, 10**9))
+    assert watcher.check() is not None
+    assert calc.cfg.precision == 2
+    assert len(calc.history.list()) == 3
+    assert calc.autosave_observer is not None
+    assert calc.apply_operation("divide", 1, 3) == 0.33
+    assert os.path.exists(tmp_path / "history.csv")
+    # undo state survives the reload
+    calc.history.undo()
+    assert len(calc.history.list()) == 3
+    watcher.unregister(calc)
+    assert watcher.targets == []
+
+
+def test_plain_config_reads_dotenv(tmp_path, monkeypatch):
+    import app.calculator_config as calculator_config
+
+    monkeypatch.delenv("CALCULATOR_PRECISION", raising=False)
+    env_file = tmp_path / ".env"
+    env_file.write_text("CALCULATOR_PRECISION=3\n")
+    monkeypatch.setattr(calculator_config, "DEFAULT_SOURCE", ConfigSource(str(env_file)))
+    assert Config().precision == 3
+    env_file.write_text("CALCULATOR_PRECISION=4\n")
+    os.utime(env_file, ns=(0, 10**9))
+    assert Config().precision == 4
+    monkeypatch.setenv("CALCULATOR_PRECISION", "5")
+    assert Config().precision == 5
+
+
+def test_watcher_applies_only_fields_changed_in_source(tmp_path, monkeypatch):
+    monkeypatch.delenv("CALCULATOR_PRECISION", raising=False)
+    monkeypatch.delenv("CALCULATOR_LOG_FILE", raising=False)
+    env_file = tmp_path / ".env"
+    env_file.write_text("CALCULATOR_LOG_FILE=a.log\n")
+    source = ConfigSource(str(env_file))
+    calc = Calculator(source.load(precision=2, auto_save=False, history_dir=str(tmp_path)))
+    watcher = ConfigWatcher(source)
+    calc.watch_config(watcher)
+
+    env_file.write_text("CALCULATOR_LOG_FILE=b.log\n")
+    os.utime(env_file, ns=(0, 10**9))
+    assert watcher.check() is not None
+    # programmatic settings survive an edit that does not touch them
+    assert calc.cfg.precision == 2
+    assert calc.cfg.auto_save is False
+    assert calc.autosave_observer is None
+
+    env_file.write_text("CALCULATOR_LOG_FILE=b.log\nCALCULATOR_PRECISION=4\n")
+    os.utime(env_file, ns=(0, 2 * 10**9))
+    watcher.check()
+    assert calc.cfg.precision == 4
+    assert calc.cfg.auto_save is False
+
+
+def test_watcher_finds_dotenv_created_after_start(tmp_path, monkeypatch):
+    import app.calculator_config as calculator_config
+
+    monkeypatch.delenv("CALCULATOR_PRECISION", raising=False)
+    env_file = tmp_path / ".env"
+    monkeypatch.setattr(calculator_config, "find_dotenv", lambda: str(env_file) if env_file.exists() else "")
+    source = ConfigSource()
+    calc = Calculator(source.load(auto_save=False, history_dir=str(tmp_path)))
+    watcher = ConfigWatcher(source)
+    calc.watch_config(watcher)
+    assert source.path == ""
+    assert watcher.check() is None
+
+    env_file.write_text("CALCULATOR_PRECISION=3\n")
+    assert watcher.check() is not None
+    assert source.path == str(env_file)
+    assert calc.cfg.precision == 3
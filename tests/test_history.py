@@ -71,3 +71,17 @@ def test_load_missing_file_raises(tmp_path):
         assert isinstance(e, PersistenceError)
     else:
         assert False, "Expected PersistenceError"
+
+
+def test_estimate_bytes_counts_shared_calculations_once():
+    from app.history import CALCULATION_BYTES, MEMENTO_BYTES
+
+    h = History()
+    for i in range(10):
+        h.add(Calculation.create("add", [i, 1], i + 1))
+    # 10 items, 10 undo snapshots holding 0..9 entries; 11 Calculations at most
+    assert h.estimate_bytes() == 11 * CALCULATION_BYTES + 10 * MEMENTO_BYTES + (10 + 45) * 8
+    h.undo()
+    h.undo()
+    # undo moves snapshots to the redo stack without creating Calculations
+    assert h.estimate_bytes() == 11 * CALCULATION_BYTES + 10 * MEMENTO_BYTES + (8 + 28 + 19) * 8
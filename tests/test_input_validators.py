@@ -1,5 +1,7 @@
+import time
+import numpy as np
 import pytest
-from app.input_validators import to_number, check_limits
+from app.input_validators import to_number, check_limits, parse_numbers, validate_numbers
 from app.exceptions import ValidationError
 
 
@@ -19,3 +21,102 @@ def test_check_limits_ok():
 def test_check_limits_exceed():
     with pytest.raises(ValidationError):
         check_limits(1e9, 1e3)
+
+
+def test_parse_numbers_buffer_and_mask():
+    values, parsed = parse_numbers(b"1.5, 2 nan abc 1e3")
+    assert parsed.tolist() == [True, True, True, False, True]
+    assert values[0] == 1.5 and values[4] == 1000.0
+
+
+def test_validate_numbers_reports_positions():
+    res = validate_numbers(["1", "x", "5e20", "nan", "inf", None], max_value=1e12)
+    assert res.valid.tolist() == [True, False, False, False, False, False]
+    assert res.errors.tolist() == [1, 2, 3, 4, 5]
+    with pytest.raises(ValidationError):
+        res.raise_if_invalid(limit=2)
+
+
+def test_validate_numbers_policies():
+    res = validate_numbers(["nan", "inf", "-inf", "3"], max_value=100, nan_policy="allow", inf_policy="clip")
+    assert res.ok
+    assert res.values[1:].tolist() == [100.0, -100.0, 3.0]
+    res = validate_numbers([1.0, float("inf")], max_value=100, inf_policy="allow")
+    assert res.ok
+    res.raise_if_invalid()
+    with pytest.raises(ValueError):
+        validate_numbers(["1"], max_value=1, nan_policy="bogus")
+    with pytest.raises(ValueError):
+        validate_numbers(["1"], max_value=1, inf_policy="bogus")
+
+
+def test_parse_numbers_mixed_inputs_have_fixed_semantics():
+    mixed = ["1_000", None, True, 2, " nan ", 3.5, b"1", "x"]
+    values, parsed = parse_numbers(mixed)
+    assert parsed.tolist() == [True, False, False, True, True, True, False, False]
+    assert values[0] == 1000.0 and values[3] == 2.0
+    # an entry parses the same whether or not a bad entry is also present
+    for item in ["1_000", None, True, 2, "1e400"]:
+        alone = parse_numbers([item])[1][0]
+        with_bad = parse_numbers([item, "x"])[1][0]
+        assert alone == with_bad
+
+
+def test_parse_numbers_bad_entries_deep_in_large_input():
+    tokens = [str(i) for i in range(10000)]
+    tokens[7] = "bad"
+    tokens[9999] = None
+    res = validate_numbers(tokens, max_value=1e12)
+    assert res.errors.tolist() == [7, 9999]
+    assert res.values[5000] == 5000.0
+    assert validate_numbers(np.array([True]), max_value=1).errors.tolist() == [0]
+    assert validate_numbers(np.arange(3), max_value=1).errors.tolist() == [2]
+
+
+def _float_or_none(token):
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def test_parse_numbers_follows_float_for_ascii_strings():
+    tokens = ["1.", "-.5e-3", " 2 ", "+inf", "-Infinity ", "\tNaN", "1_0.5_5", "1e1_0", "1__0", "_1", "1_",
+              "1.2.3", "+-1", "7E 9", "1e", ".", "", "0x10", "infinit", "9E47", "1e400", "\x1c1", "\u0663"]
+    values, parsed = parse_numbers(tokens)
+    for token, value, ok in zip(tokens[:-1], values, parsed):
+        expected = _float_or_none(token)
+        assert ok == (expected is not None), token
+        if ok:
+            assert value == expected or (np.isnan(value) and np.isnan(expected)), token
+    # non-ASCII digits are rejected even though float() accepts them
+    assert not parsed[-1]
+    values, parsed = parse_numbers([1, 10 ** 400, float("nan"), "3"])
+    assert parsed.tolist() == [True, False, True, True]
+
+
+def test_parse_numbers_error_heavy_input_is_not_slower_than_loop():
+    rng = np.random.default_rng(0)
+    bad = ["abc", "1.2.3", "--1", "1__0", "x1"]
+    good = [f"{v:.6f}" for v in rng.random(100000) * 1000]
+    tokens = [bad[i % len(bad)] if i % 2 else good[i] for i in range(len(good))]
+    tokens[4] = " inf "
+    tokens[6] = "1_000"
+
+    def loop():
+        return [_float_or_none(t) for t in tokens]
+
+    def best(fn):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    values, parsed = parse_numbers(tokens)
+    expected = loop()
+    assert parsed.tolist() == [v is not None for v in expected]
+    assert values[6] == 1000.0 and values[4] == np.inf
+    # the old per-block bisection took several times the loop on input like this
+    assert best(lambda: parse_numbers(tokens)) < 2 * best(loop)
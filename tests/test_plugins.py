@@ -0,0 +1,120 @@
+import sys
+from types import SimpleNamespace
+import pytest
+from app import plugins
+from app.calculator import Calculator
+from app.calculator_config import Config
+from app.exceptions import OperationError
+from app.operations import OP_REGISTRY, get_operation
+
+PLUGIN_SRC = '''
+from app.operations import operation, Operation
+
+
+@operation("triple_sum", "Three times a + b", arity=2)
+class TripleSum(Operation):
+    def execute(self, a, b):
+        return self.fmt(3 * (a + b))
+'''
+
+
+@pytest.fixture
+def clean_registry(monkeypatch):
+    before = dict(OP_REGISTRY)
+    monkeypatch.setattr(plugins, "_entry_points_scanned", False)
+    yield
+    OP_REGISTRY.clear()
+    OP_REGISTRY.update(before)
+    plugins._discovered.clear()
+
+
+def test_scan_source_reads_decorator_metadata():
+    meta = plugins.scan_source(PLUGIN_SRC)
+    assert meta == {"TripleSum": {"name": "triple_sum", "help_text": "Three times a + b", "arity": 2}}
+
+
+def test_directory_plugin_is_lazy(tmp_path, clean_registry):
+    (tmp_path / "triple.py").write_text(PLUGIN_SRC)
+    (tmp_path / "broken.py").write_text("def (:\n")
+    cfg = Config()
+    cfg.auto_save = False
+    cfg.plugin_dir = str(tmp_path)
+    calc = Calculator(cfg)
+    assert isinstance(OP_REGISTRY["triple_sum"], plugins.LazyOperation)
+    assert "calculator_plugins.triple" not in sys.modules
+    assert "triple_sum: Three times a + b" in calc.help_text()
+    assert calc.apply_operation("triple_sum", 1, 2) == 9
+    assert not isinstance(OP_REGISTRY["triple_sum"], plugins.LazyOperation)
+    # second discovery of the same directory is a no-op
+    assert plugins.discover_directory(str(tmp_path)) == []
+
+
+def test_entry_point_plugin(tmp_path, monkeypatch, clean_registry):
+    pkg = tmp_path / "ep_plugin_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "ops.py").write_text(PLUGIN_SRC.replace("triple_sum", "ep_triple"))
+    (pkg / "plain.py").write_text(
+        "from app.operations import Operation\n\n\nclass Neg(Operation):\n    def execute(self, a, b):\n        return -a\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    eps = [
+        SimpleNamespace(name="ep_triple", value="ep_plugin_pkg.ops:TripleSum"),
+        SimpleNamespace(name="ep_neg", value="ep_plugin_pkg.plain:Neg"),
+        SimpleNamespace(name="ep_missing", value="ep_plugin_pkg.plain:Nope"),
+    ]
+    monkeypatch.setattr(plugins, "_entry_points", lambda: eps)
+    assert plugins.load_plugins() == ["ep_triple", "ep_neg", "ep_missing"]
+    assert OP_REGISTRY["ep_triple"].help_text == "Three times a + b"
+    assert "ep_plugin_pkg.ops" not in sys.modules
+    assert get_operation("ep_triple").execute(1, 1) == 6
+    assert get_operation("ep_neg").execute(4, 0) == -4
+    calc = Calculator()
+    with pytest.raises(OperationError):
+        calc.apply_operation("ep_missing", 1, 2)
+
+
+def test_entry_points_scanned_once_per_process(monkeypatch, clean_registry):
+    scans = {"n": 0}
+
+    def fake_entry_points():
+        scans["n"] += 1
+        return []
+
+    monkeypatch.setattr(plugins, "_entry_points", fake_entry_points)
+    for _ in range(3):
+        Calculator()
+    assert scans["n"] == 1
+
+
+def test_loading_plugin_cannot_replace_other_operations(tmp_path, clean_registry):
+    (tmp_path / "sneaky.py").write_text(
+        PLUGIN_SRC
+        + '''
+
+@operation("add", "Hijacked add")
+class BadAdd(Operation):
+    def execute(self, a, b):
+        return 999
+
+
+@operation("undiscovered_" + "name", "Not statically visible")
+class Hidden(Operation):
+    def execute(self, a, b):
+        return 0
+'''
+    )
+    (tmp_path / "broken_import.py").write_text(
+        "from app.operations import operation, Operation\n\n\n"
+        '@operation("subtract")\nclass S(Operation):\n    pass\n\n\n'
+        '@operation("explodes", "Raises on import")\nclass E(Operation):\n    pass\n\n\n'
+        "raise RuntimeError('boom')\n"
+    )
+    plugins.discover_directory(str(tmp_path))
+    assert get_operation("triple_sum").execute(1, 2) == 9
+    assert get_operation("add").execute(1, 2) == 3
+    assert "undiscovered_name" not in OP_REGISTRY
+    with pytest.raises(RuntimeError):
+        get_operation("explodes")
+    assert get_operation("subtract").execute(5, 2) == 3
+    assert isinstance(OP_REGISTRY["explodes"], plugins.LazyOperation)
@@ -0,0 +1,158 @@
+import pytest
+from app.history import History
+from app.calculation import Calculation
+from app.calculator import Calculator
+from app.calculator_config import Config
+from app.session import SessionSnapshot, restore_history
+from app.exceptions import PersistenceError
+
+
+def _history_with(n):
+    h = History(max_size=50)
+    for i in range(n):
+        h.add(Calculation.create("add", [i, 1], i + 1))
+    return h
+
+
+def test_snapshot_roundtrip_restores_undo_redo(tmp_path):
+    h = _history_with(3)
+    h.undo()
+    path = str(tmp_path / "s.snap")
+    SessionSnapshot(path).write(h, {"precision": 3})
+
+    state = SessionSnapshot.read(path)
+    assert state.overrides == {"precision": 3}
+    h2 = History()
+    restore_history(h2, state)
+    assert [c.result for c in h2.list()] == [1.0, 2.0]
+    assert h2.max_size == 50
+    h2.redo()
+    assert len(h2.list()) == 3
+    h2.undo()
+    h2.undo()
+    assert len(h2.list()) == 1
+
+
+def test_snapshot_incremental_append(tmp_path):
+    h = _history_with(2)
+    path = tmp_path / "s.snap"
+    snap = SessionSnapshot(str(path))
+    snap.write(h)
+    size_before = path.stat().st_size
+    h.add(Calculation.create("multiply", [2, 3], 6))
+    snap.write(h)
+    assert path.stat().st_size > size_before
+    state = SessionSnapshot.read(str(path))
+    assert [c.operation for c in state.items] == ["add", "add", "multiply"]
+
+    snap.compact(h)
+    assert SessionSnapshot.read(str(path)).items[-1].result == 6.0
+
+
+def test_snapshot_ignores_truncated_tail(tmp_path):
+    h = _history_with(1)
+    path = tmp_path / "s.snap"
+    snap = SessionSnapshot(str(path))
+    snap.write(h)
+    h.add(Calculation.create("add", [5, 5], 10))
+    snap.write(h)
+    data = path.read_bytes()
+    path.write_bytes(data[:-3])
+    assert len(SessionSnapshot.read(str(path)).items) == 1
+
+
+def test_snapshot_integrity_errors(tmp_path):
+    path = tmp_path / "s.snap"
+    SessionSnapshot(str(path)).write(_history_with(1))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(PersistenceError):
+        SessionSnapshot.read(str(path))
+
+    path.write_bytes(b"not a snapshot file")
+    with pytest.raises(PersistenceError):
+        SessionSnapshot.read(str(path))
+    with pytest.raises(PersistenceError):
+        SessionSnapshot.read(str(tmp_path / "missing.snap"))
+
+
+def test_calculator_save_and_restore_session(tmp_path):
+    cfg = Config()
+    cfg.auto_save = False
+    calc = Calculator(cfg)
+    calc.apply_operation("add", 1, 2)
+    calc.apply_operation("multiply", 2, 3)
+    path = str(tmp_path / "session.snap")
+    calc.cfg.precision = 2
+    calc.save_session(path)
+
+    cfg2 = Config()
+    cfg2.auto_save = False
+    calc2 = Calculator(cfg2)
+    calc2.restore_session(path)
+    assert calc2.cfg.precision == 2
+    assert len(calc2.history.list()) == 2
+    calc2.history.undo()
+    assert len(calc2.history.list()) == 1
+
+
+def test_repeated_saves_stay_bounded_and_restore_exactly(tmp_path):
+    h = History(max_size=20)
+    path = tmp_path / "s.snap"
+    snap = SessionSnapshot(str(path))
+    largest = 0
+    for i in range(600):
+        h.add(Calculation.create("add", [i, 1], i + 1))
+        if i % 37 == 0:
+            h.undo()
+            h.undo()
+            h.redo()
+        if i % 200 == 199:
+            h.clear()
+        if i % 10 == 9:
+            snap.write(h)
+            largest = max(largest, path.stat().st_size)
+
+    state = SessionSnapshot.read(str(path))
+    restored = History()
+    restore_history(restored, state)
+    assert restored.export_state() == h.export_state()
+
+    snap.compact(h)
+    # superseded STATE frames trigger automatic compaction long before this
+    assert largest <= 3 * path.stat().st_size
+
+
+def test_incremental_write_work_is_bounded(tmp_path, monkeypatch):
+    h = History(max_size=300)
+    for i in range(300):
+        h.add(Calculation.create("add", [i, 1], i + 1))
+    snap = SessionSnapshot(str(tmp_path / "s.snap"))
+    snap.write(h)
+
+    calls = {"n": 0}
+    original = SessionSnapshot._intern
+
+    def counting(self, calc, out):
+        calls["n"] += 1
+        return original(self, calc, out)
+
+    monkeypatch.setattr(SessionSnapshot, "_intern", counting)
+    h.add(Calculation.create("add", [1, 1], 2))
+    snap.write(h)
+    # the live items plus the one new memento's appended calculation, not ~300 x 300
+    assert calls["n"] <= len(h.list()) + 5
+
+
+def test_corrupt_calculation_payload_raises_persistence_error(tmp_path):
+    import struct
+    import zlib
+    from app.session import MAGIC, FORMAT_VERSION, FRAME_CALC
+
+    payload = b"\xff\x00"
+    frame = struct.pack("<BII", FRAME_CALC, len(payload), zlib.crc32(payload)) + payload
+    path = tmp_path / "bad.snap"
+    path.write_bytes(struct.pack("<8sH", MAGIC, FORMAT_VERSION) + frame)
+    with pytest.raises(PersistenceError):
+        SessionSnapshot.read(str(path))
@@ -0,0 +1,143 @@
+import os
+import pytest
+from app.calculator_config import Config
+from app.exceptions import ValidationError
+from app.session_manager import SessionManager
+
+
+def _manager(tmp_path, **kwargs):
+    cfg = Config()
+    cfg.auto_save = False
+    return SessionManager(cfg, spill_dir=str(tmp_path / "spill"), **kwargs)
+
+
+def test_sessions_have_separate_history(tmp_path):
+    mgr = _manager(tmp_path)
+    mgr.apply("alice", "add", 1, 2)
+    mgr.apply("bob", "multiply", 2, 3)
+    mgr.apply("bob", "add", 1, 1)
+    assert len(mgr.get("alice").history.list()) == 1
+    assert len(mgr.get("bob").history.list()) == 2
+    with pytest.raises(ValidationError):
+        mgr.get("../etc")
+
+
+def test_lru_spill_and_restore(tmp_path):
+    mgr = _manager(tmp_path, max_resident=1)
+    mgr.apply("alice", "add", 1, 2)
+    mgr.apply("alice", "add", 2, 2)
+    mgr.get("alice").history.undo()
+    mgr.apply("bob", "add", 3, 3)
+    m = mgr.metrics()
+    assert m["resident_sessions"] == 1 and m["spilled_sessions"] == 1
+    assert m["active_sessions"] == 2 and m["spills"] == 1
+    assert os.path.exists(tmp_path / "spill" / "alice.snap")
+
+    alice = mgr.get("alice")
+    assert [c.result for c in alice.history.list()] == [3.0]
+    alice.history.redo()
+    assert len(alice.history.list()) == 2
+    m = mgr.metrics()
+    assert m["restores"] == 1 and m["last_restore_seconds"] >= 0
+    assert not os.path.exists(tmp_path / "spill" / "alice.snap")
+
+    mgr.close("bob")
+    mgr.close("alice")
+    assert mgr.metrics()["active_sessions"] == 0
+
+
+def test_session_budget_discards_oldest_undo(tmp_path):
+    mgr = _manager(tmp_path, session_budget_bytes=20000)
+    for i in range(20):
+        mgr.apply("alice", "add", i, 1)
+    calc = mgr.get("alice")
+    assert calc.history.estimate_bytes() <= 20000
+    assert len(calc.history.list()) == 20
+    assert mgr.metrics()["undo_snapshots_discarded"] > 0
+
+
+def test_total_budget_spills_other_sessions(tmp_path):
+    mgr = _manager(tmp_path, total_budget_bytes=3000)
+    mgr.apply("alice", "add", 1, 1)
+    mgr.apply("alice", "add", 1, 1)
+    mgr.apply("bob", "add", 1, 1)
+    mgr.apply("bob", "add", 1, 1)
+    m = mgr.metrics()
+    assert m["resident_sessions"] == 1 and m["spilled_sessions"] == 1
+    assert m["resident_bytes"] > 0
+
+
+def test_apply_config_reaches_resident_and_spilled_sessions(tmp_path):
+    mgr = _manager(tmp_path, max_resident=1)
+    mgr.apply("alice", "divide", 1, 3)
+    mgr.apply("bob", "divide", 1, 3)
+    new_cfg = Config()
+    new_cfg.auto_save = False
+    new_cfg.precision = 2
+    mgr.apply_config(new_cfg)
+    assert mgr.get("bob").cfg.precision == 2
+    assert mgr.get("alice").cfg.precision == 2
+    assert mgr.get("alice").cfg.history_file == "alice.csv"
+
+
+def test_failed_spill_keeps_session_resident(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    cfg = Config()
+    cfg.auto_save = False
+    mgr = SessionManager(cfg, spill_dir=str(blocker / "spill"), max_resident=1)
+    mgr.apply("alice", "add", 1, 2)
+    mgr.apply("bob", "add", 3, 4)
+    m = mgr.metrics()
+    assert m["spill_failures"] >= 1 and m["spills"] == 0
+    assert m["resident_sessions"] == 2
+    assert [c.result for c in mgr.get("alice").history.list()] == [3.0]
+    assert [c.result for c in mgr.get("bob").history.list()] == [7.0]
+
+
+def test_budget_enforced_outside_apply_and_overruns_reported(tmp_path):
+    mgr = _manager(tmp_path, session_budget_bytes=100)
+    calc = mgr.get("alice")
+    calc.apply_operation("add", 1, 1)
+    calc.apply_operation("add", 2, 2)
+    assert calc.history.estimate_bytes() > 100
+    m = mgr.metrics()
+    assert m["undo_snapshots_discarded"] == 2
+    assert m["budget_overruns"] == 2
+
+
+def test_per_session_settings_survive_spill_without_reload(tmp_path):
+    mgr = _manager(tmp_path, max_resident=1)
+    mgr.get("alice").cfg.precision = 2
+    mgr.apply("alice", "divide", 1, 3)
+    mgr.apply("bob", "add", 1, 1)
+    assert mgr.metrics()["spilled_sessions"] == 1
+    assert mgr.get("alice").cfg.precision == 2
+
+
+def test_apply_config_forwards_only_changed_fields(tmp_path):
+    mgr = _manager(tmp_path, max_resident=1)
+    alice = mgr.get("alice")
+    alice.cfg.precision = 3
+    alice.cfg.max_input_value = 50.0
+    mgr.apply("alice", "divide", 1, 3)
+    bob = mgr.get("bob")
+    bob.cfg.precision = 4
+    assert mgr.metrics()["spilled_sessions"] == 1
+
+    new_cfg = Config()
+    new_cfg.auto_save = False
+    new_cfg.max_history_size = 5
+    assert mgr.apply_config(new_cfg) == ["max_history_size"]
+    assert bob.cfg.precision == 4 and bob.cfg.max_history_size == 5
+    # a restored session receives only what changed while it was on disk
+    alice = mgr.get("alice")
+    assert alice.cfg.precision == 3 and alice.cfg.max_input_value == 50.0
+    assert alice.cfg.max_history_size == 5
+
+    new_cfg.precision = 2
+    assert mgr.apply_config(new_cfg) == ["precision"]
+    assert mgr.apply_config(new_cfg) == []
+    assert mgr.get("bob").cfg.precision == 2
+    assert mgr.get("alice").cfg.max_input_value == 50.0
+    assert mgr.get("alice").cfg.precision == 2